@@ -15,9 +15,9 @@ runner_params = hello_imgui.RunnerParams()
 runner_params.app_window_params.window_title = "Viewer"
 runner_params.app_window_params.window_geometry.size = (1400, 1080)
 runner_params.imgui_window_params.show_status_bar = True
+runner_params.imgui_window_params.tweaked_theme.theme = hello_imgui.ImGuiTheme_.imgui_colors_dark
 
 def gui():
-    hello_imgui.apply_theme(hello_imgui.ImGuiTheme_.imgui_colors_dark)
     vec = imgui.get_main_viewport().pos
     imgui.set_next_window_pos(vec, imgui.Cond_.once)
     imgui.set_next_window_size(imgui.get_main_viewport().size)
@@ -1,7 +1,6 @@
 import pyvista as pv
 from pyvista_imgui import ImguiPlotter
 from threading import Thread
-import time
 
 sphere = pv.Sphere()
 
@@ -9,20 +8,10 @@ plotter = ImguiPlotter()
 plotter.add_axes()
 plotter.add_mesh(sphere, render=False)
 
-done = False
-
-def plot():
-    try:
-        plotter.show()
-    finally:
-        done = True
-
-t = Thread(target=plot)
+t = Thread(target=plotter.show, daemon=True)
 t.start()
 
-
-while not done:
-    time.sleep(0.5)
+# the main thread stays responsive and wakes up as soon as the viewer is closed
+while t.is_alive():
+    t.join(timeout=0.5)
     print("sleeping")
-t.join()
-
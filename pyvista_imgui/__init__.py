@@ -10,6 +10,26 @@ except Exception:  # pragma: no cover # pylint: disable=broad-exception-caught
 
 from .texture_render_window import *
 from .imgui_render_window import *
-from .plotting import *
+# the backends register themselves on import
 from ._backend_imgui_bundle import *
-from ._backend_pyimgui import *
\ No newline at end of file
+from ._backend_pyimgui import *
+
+from . import texture_render_window as _texture_render_window
+from . import imgui_render_window as _imgui_render_window
+from . import _backend_imgui_bundle, _backend_pyimgui
+
+__all__ = [*_texture_render_window.__all__,
+           *_imgui_render_window.__all__,
+           'ImguiPlotter',
+           *_backend_imgui_bundle.__all__,
+           *_backend_pyimgui.__all__]
+
+
+def __getattr__(name):
+    # importing pyvista dominates the import time of this package,
+    # so the plotter module is only imported once the plotter is actually used
+    if name == 'ImguiPlotter':
+        from .plotting import ImguiPlotter
+        globals()[name] = ImguiPlotter
+        return ImguiPlotter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
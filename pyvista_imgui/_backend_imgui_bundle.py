@@ -1,11 +1,9 @@
 import typing as typ
 from .imgui_render_window import RendererBackend, register_backend
-from vtkmodules.vtkCommonCore import vtkCommand
 from vtkmodules.vtkRenderingCore import vtkRenderWindow, vtkRenderWindowInteractor
-import typing as typ
 
 try:
-    from imgui_bundle import imgui
+    from imgui_bundle import imgui, immapp, hello_imgui
 except ImportError:
     imgui = None
 
@@ -90,99 +88,132 @@ if imgui:
         _Key.scroll_lock: ('Scroll_Lock', None),
     }
 
-    _ignore_keys = {
-        _Key.mouse_left,
-        _Key.mouse_right,
-        _Key.mouse_middle,
-        _Key.mouse_wheel_x,
-        _Key.mouse_wheel_y,
-    }
+    # dense table of (keysym, keychar) indexed by the raw key code relative to the first named key,
+    # entries of keys unknown to vtk are None, missing keychars are replaced with '\0' upfront
+    _KEY_START = _Key.named_key_begin.value
+    _KEY_END = _Key.named_key_end.value
+    _KEYSYM_TABLE = [None] * (_KEY_END - _KEY_START)
+    for _k, (_sym, _char) in _keysyms.items():
+        _KEYSYM_TABLE[_k.value - _KEY_START] = (_sym, _char or '\0')
+    _KEYSYM_TABLE = tuple(_KEYSYM_TABLE)
+    del _k, _sym, _char
+
+    # the keys polled on each frame along with their index into the table
+    _polled_keys = tuple((k, k.value - _KEY_START) for k in _keysyms)
+
+    _WINDOW_PADDING = imgui.StyleVar_.window_padding
+    # make the image unscrollable to ensure correct mouse behavior
+    _NO_SCROLL_FLAGS = imgui.WindowFlags_.no_scrollbar | imgui.WindowFlags_.no_scroll_with_mouse
+
+    # flags of the fullscreen window created by show()
+    _VIEWER_WINDOW_FLAGS = imgui.WindowFlags_.no_bring_to_front_on_focus | \
+                           imgui.WindowFlags_.no_title_bar | \
+                           imgui.WindowFlags_.no_decoration | \
+                           imgui.WindowFlags_.no_resize | \
+                           imgui.WindowFlags_.no_move
 
 
 __all__ = ['RendererBackendImguiBundle']
 
-@register_backend("imgui_bundle")
+# constants used on every frame
+_NUL = '\0'
+_UV0 = (0, 1)
+_UV1 = (1, 0)
+_PAD = (0, 0)
+
 class RendererBackendImguiBundle(RendererBackend):
     def __init__(self, 
                  interactor: vtkRenderWindowInteractor, 
                  render_window: vtkRenderWindow,
                  border = False) -> None:
-        if not imgui:
-            raise ModuleNotFoundError(f"{self.__class__.__name__} requires the 'imgui_bundle' package.")
         super().__init__(interactor, render_window, border=border)
+        # keys held down during the previous frame and the event information they were sent with
+        self._last_pressed = set()
+        self._last_key_event = (0, 0, False, False)
+        # size of the main viewport the standalone window has been fitted to
+        self._last_viewport_size = None
 
     def render(self, size: typ.Optional[tuple[int, int]] = None):
         # get the maximum available size
-        size = size or imgui.get_content_region_avail()
-        size = (size.x, size.y)
-        self.render_window.size = size
-        self.render_window.render()
-
-        # adjust the size of this interactor as well
-        self.interactor.SetSize(int(size[0]), int(size[1]))
-        self.interactor.ConfigureEvent()
-
-        # render the texture with the vtk output into an image
-        imgui.push_style_var(imgui.StyleVar_.window_padding, (0, 0))
-        # make the image unscrollable to ensure correct mouse behavior
-        no_scroll_flags = imgui.WindowFlags_.no_scrollbar | imgui.WindowFlags_.no_scroll_with_mouse
-        imgui.begin_child("##Viewport", size, self.border, no_scroll_flags)
-        imgui.image(self.render_window.texture_id, 
-                    imgui.get_content_region_avail(), 
-                    (0, 1), (1, 0))
-        # process the events of this widget
+        if size is None:
+            avail = imgui.get_content_region_avail()
+            size = (avail.x, avail.y)
+        # there is nothing to display for collapsed viewports
+        if size[0] < 1 or size[1] < 1:
+            return
+        interactor_size = (int(size[0]), int(size[1]))
+        if interactor_size != self._last_set_size:
+            # adjust the size of this interactor before passing any events to it
+            self.interactor.SetSize(*interactor_size)
+            self.interactor.ConfigureEvent()
+            self._last_set_size = interactor_size
+
+        # borderless child windows have no padding, so the style only needs adjusting for a border
+        if self.border:
+            imgui.push_style_var(_WINDOW_PADDING, _PAD)
+        imgui.begin_child("##Viewport", size, self.border, _NO_SCROLL_FLAGS)
+        # process the events of this widget before rendering, so the image already reflects them
         self.process_events()
+        # keep showing the previous texture while the viewport is scrolled out of view
+        if imgui.is_rect_visible(size) or self.render_window.texture_id is None:
+            self._render_if_needed(size)
+        # render the texture with the vtk output into an image,
+        # the child has no padding, so the image covers its full size
+        imgui.image(self.render_window.texture_id, 
+                    size, 
+                    _UV0, _UV1)
         imgui.end_child()
-        imgui.pop_style_var()
-
-    def _process_mouse_events(self, io):
-        if imgui.is_window_hovered():
-            if io.mouse_clicked[imgui.MouseButton_.left]:
-                self.interactor.InvokeEvent(vtkCommand.LeftButtonPressEvent)
-            elif io.mouse_clicked[imgui.MouseButton_.right]:
-                self.interactor.InvokeEvent(vtkCommand.RightButtonPressEvent)
-            elif io.mouse_clicked[imgui.MouseButton_.middle]:
-                self.interactor.InvokeEvent(vtkCommand.MiddleButtonPressEvent)
-            elif io.mouse_wheel > 0:
-                self.interactor.InvokeEvent(vtkCommand.MouseWheelForwardEvent)
-            elif io.mouse_wheel < 0:
-                self.interactor.InvokeEvent(vtkCommand.MouseWheelBackwardEvent)
-
-        if io.mouse_released[imgui.MouseButton_.left]:
-            self.interactor.InvokeEvent(vtkCommand.LeftButtonReleaseEvent)
-        elif io.mouse_released[imgui.MouseButton_.right]:
-            self.interactor.InvokeEvent(vtkCommand.RightButtonReleaseEvent)
-        elif io.mouse_released[imgui.MouseButton_.middle]:
-            self.interactor.InvokeEvent(vtkCommand.MiddleButtonReleaseEvent)
-        
-        self.interactor.InvokeEvent(vtkCommand.MouseMoveEvent)
-
-    def _process_keyboard_events(self, xpos, ypos, ctrl, shift):
-        if imgui.is_window_hovered():
-            key_start = imgui.Key.named_key_begin.value
-            key_end = imgui.Key.named_key_end.value
-            
-            # for each valid key check if it's state changed and emit the appropriate vtk event
-            for k in range(key_start, key_end):
-                k = imgui.Key(k)
-                if k in _ignore_keys:
-                    continue
-
-                if imgui.is_key_pressed(k) or imgui.is_key_released(k):
-                    try:
-                        keysym, keychar = _keysyms[k]
-                    except (KeyError):
-                        keysym = None
-                        keychar = None
-
-                    keychar = keychar or '\0'
-
-                    self.interactor.SetEventInformationFlipY(xpos, ypos, ctrl, shift, keychar, 0, keysym)
-                    if imgui.is_key_pressed(k):
-                        self.interactor.KeyPressEvent()
-                        self.interactor.CharEvent()
-                    else:
-                        self.interactor.KeyReleaseEvent()
+        if self.border:
+            imgui.pop_style_var()
+
+    def _process_mouse_events(self, io, hovered, clicked, moved):
+        wheel = 0.0
+        # wheel motion is only handled while hovering the viewport
+        if hovered:
+            wheel = io.mouse_wheel
+        mr = io.mouse_released
+        released = mr[0] | mr[1] << 1 | mr[2] << 2
+        self._dispatch_mouse_events(clicked, released, wheel, moved)
+
+    def _process_keyboard_events(self, hovered, xpos, ypos, ctrl, shift):
+        if not hovered:
+            # keys held down when leaving the viewport would never be released otherwise
+            self._release_keys(xpos, ypos, ctrl, shift)
+            return
+        # only poll the keys known to vtk and diff them against the previous frame,
+        # so release events are emitted for keys that actually changed their state
+        current = {(k, i) for k, i in _polled_keys if imgui.is_key_down(k)}
+        released = self._last_pressed - current
+        self._last_pressed = current
+
+        for k, i in current:
+            # the first press and the key repeats of held keys
+            if imgui.is_key_pressed(k, repeat=True):
+                keysym, keychar = _KEYSYM_TABLE[i]
+                self._set_event(xpos, ypos, ctrl, shift, keychar, 0, keysym)
+                self._last_event_info = None
+                self.interactor.KeyPressEvent()
+                self.interactor.CharEvent()
+                self._events_dispatched = True
+
+        for k, i in released:
+            self._send_key_release(i, xpos, ypos, ctrl, shift)
+        self._last_key_event = (xpos, ypos, ctrl, shift)
+
+    def _send_key_release(self, i, xpos, ypos, ctrl, shift):
+        keysym, keychar = _KEYSYM_TABLE[i]
+        self._set_event(xpos, ypos, ctrl, shift, keychar, 0, keysym)
+        self._last_event_info = None
+        self.interactor.KeyReleaseEvent()
+        self._events_dispatched = True
+
+    def _release_keys(self, xpos, ypos, ctrl, shift):
+        """
+        Sends release events for all keys that are still held down.
+        """
+        for k, i in self._last_pressed:
+            self._send_key_release(i, xpos, ypos, ctrl, shift)
+        self._last_pressed = set()
 
     def process_events(self):
         """
@@ -190,10 +221,15 @@ class RendererBackendImguiBundle(RendererBackend):
         on rendering.
         """
         # do nothing as long as the mouse pointer is not within the current window or it is not focussed
-        if not imgui.is_window_focused() and not imgui.is_window_hovered():
+        hovered = imgui.is_window_hovered()
+        if not hovered and not imgui.is_window_focused():
+            if self._last_pressed:
+                self._release_keys(*self._last_key_event)
             return
-        io = imgui.get_io()
-        io.config_windows_move_from_title_bar_only = True # do not drag the window when clicking on the image
+        io = self._io
+        if io is None:
+            io = self._io = imgui.get_io()
+            io.config_windows_move_from_title_bar_only = True # do not drag the window when clicking on the image
         viewport_pos = imgui.get_cursor_start_pos()
 
         xpos = int(io.mouse_pos.x - viewport_pos.x)
@@ -202,17 +238,24 @@ class RendererBackendImguiBundle(RendererBackend):
         ctrl = io.key_ctrl
         shift = io.key_shift
         
-        repeat = 0
-        if io.mouse_double_clicked[0] or io.mouse_double_clicked[1] or io.mouse_double_clicked[2]:
-            repeat = 1
+        # clicks are only handled while hovering the viewport
+        clicked = 0
+        if hovered:
+            mc = io.mouse_clicked
+            clicked = mc[0] | mc[1] << 1 | mc[2] << 2
+        repeat = self._click_repeat(clicked)
 
         if xpos < 0 or ypos < 0:
             return 
         
-        self.interactor.SetEventInformationFlipY(xpos, ypos, ctrl, shift, chr(0), repeat, None)
+        event_info = (xpos, ypos, ctrl, shift, repeat)
+        moved = event_info != self._last_event_info
+        if moved:
+            self._set_event(xpos, ypos, ctrl, shift, _NUL, repeat, None)
+            self._last_event_info = event_info
 
-        self._process_mouse_events(io)
-        self._process_keyboard_events(xpos, ypos, ctrl, shift)
+        self._process_mouse_events(io, hovered, clicked, moved)
+        self._process_keyboard_events(hovered, xpos, ypos, ctrl, shift)
 
     def show(self, 
              title: typ.Optional[str] = None, 
@@ -227,26 +270,39 @@ class RendererBackendImguiBundle(RendererBackend):
         window_size, optional
             The size of the displayed window, by default (1400, 1080)
         """
-
-        from imgui_bundle import immapp, hello_imgui, imgui     
         runner_params = hello_imgui.RunnerParams()
         runner_params.app_window_params.window_title = title or "ImguiPlotter"
         runner_params.app_window_params.window_geometry.size = window_size
         runner_params.imgui_window_params.show_status_bar = True
         runner_params.ini_folder_type = hello_imgui.IniFolderType.temp_folder
+        # let hello_imgui apply the theme once on startup instead of every frame
+        runner_params.imgui_window_params.tweaked_theme.theme = hello_imgui.ImGuiTheme_.imgui_colors_dark
 
-        def gui():
-            hello_imgui.apply_theme(hello_imgui.ImGuiTheme_.imgui_colors_dark)
-            vec = imgui.get_main_viewport().pos
-            imgui.set_next_window_pos(vec, imgui.Cond_.once)
-            imgui.set_next_window_size(imgui.get_main_viewport().size)
-            imgui.set_next_window_bg_alpha(1.0)
-            imgui.begin("Vtk Viewer", flags=imgui.WindowFlags_.no_bring_to_front_on_focus | imgui.WindowFlags_.no_title_bar | imgui.WindowFlags_.no_decoration | imgui.WindowFlags_.no_resize | imgui.WindowFlags_.no_move)
-            self.render()
-            imgui.end()
-
-        runner_params.callbacks.show_gui = gui
+        runner_params.callbacks.show_gui = self._gui
         runner_params.imgui_window_params.default_imgui_window_type = hello_imgui.DefaultImGuiWindowType.no_default_window
+        # the io object is bound to the imgui context created by the runner
+        self._io = None
+        self._last_viewport_size = None
         immapp.run(runner_params=runner_params)
-        
-      
\ No newline at end of file
+
+    def _gui(self) -> None:
+        """
+        Gui callback of the standalone application displaying the plotter in a fullscreen window.
+        """
+        viewport = imgui.get_main_viewport()
+        size = viewport.size
+        viewport_size = (size.x, size.y)
+        # follow the size of the main window, the viewer window itself can not be moved or resized
+        if viewport_size != self._last_viewport_size:
+            imgui.set_next_window_pos(viewport.pos, imgui.Cond_.once)
+            imgui.set_next_window_size(size)
+            self._last_viewport_size = viewport_size
+        imgui.set_next_window_bg_alpha(1.0)
+        imgui.begin("Vtk Viewer", flags=_VIEWER_WINDOW_FLAGS)
+        self.render()
+        imgui.end()
+
+
+# only make the backend available if its imgui bindings are installed
+if imgui:
+    register_backend("imgui_bundle")(RendererBackendImguiBundle)
@@ -1,8 +1,8 @@
 import typing as typ
+import atexit
+import sys
 from .imgui_render_window import RendererBackend, register_backend
-from vtkmodules.vtkCommonCore import vtkCommand
 from vtkmodules.vtkRenderingCore import vtkRenderWindow, vtkRenderWindowInteractor
-import typing as typ
 try:
     import imgui
 except ImportError:
@@ -10,59 +10,105 @@ except ImportError:
 
 __all__ = ['RendererBackendPyImgui']
 
-@register_backend("pyimgui")
+# constants used on every frame
+_NUL = '\0'
+_UV0 = (0, 1)
+_UV1 = (1, 0)
+_PAD = (0, 0)
+# maximum time in seconds to wait for input events before drawing the next frame of the standalone window
+_IDLE_TIMEOUT = 1 / 30
+
+if imgui:
+    _WINDOW_PADDING = imgui.STYLE_WINDOW_PADDING
+    # make the image unscrollable to ensure correct mouse behavior
+    _NO_SCROLL_FLAGS = imgui.WINDOW_NO_SCROLLBAR | imgui.WINDOW_NO_SCROLL_WITH_MOUSE
+    _MB_L = imgui.MOUSE_BUTTON_LEFT
+    _MB_R = imgui.MOUSE_BUTTON_RIGHT
+    _MB_M = imgui.MOUSE_BUTTON_MIDDLE
+
+
+# hidden (window, impl, context) bundles of the standalone application kept for subsequent calls to show()
+_SHOW_POOL = []
+# a single window is enough for the blocking show(), so vtk's textures all live in the same gl context
+_SHOW_POOL_SIZE = 1
+
+
+def _destroy_window(window, impl, context) -> None:
+    """
+    Releases a standalone window along with its imgui renderer and context.
+    """
+    import glfw
+    glfw.make_context_current(window)
+    imgui.set_current_context(context)
+    impl.shutdown()
+    imgui.destroy_context(context)
+    glfw.destroy_window(window)
+
+
+def _terminate_glfw() -> None:
+    """
+    Destroys the pooled windows and terminates glfw on exit, 
+    which runs on the main thread as required by glfw.
+    """
+    glfw = sys.modules.get('glfw')
+    if glfw is None:
+        return # show() has never been called
+    while _SHOW_POOL:
+        _destroy_window(*_SHOW_POOL.pop())
+    glfw.terminate()
+
+
+if imgui:
+    atexit.register(_terminate_glfw)
+
+
 class RendererBackendPyImgui(RendererBackend):
     def __init__(self, 
                  interactor: vtkRenderWindowInteractor, 
                  render_window: vtkRenderWindow,
                  border = False) -> None:
-        if not imgui:
-            raise ModuleNotFoundError(f"{self.__class__.__name__} requires the 'pyimgui' package.")
         super().__init__(interactor, render_window, border=border)
 
-    def render(self):
-        #if size is None:
+    def render(self, size: typ.Optional[tuple[int, int]] = None):
         # get the maximum available size
-        size = imgui.get_content_region_available()
-        size = (size.x, size.y)
-        self.render_window.size = size
-        self.render_window.render()
-
-        # adjust the size of this interactor as well
-        self.interactor.SetSize(int(size[0]), int(size[1]))
-        imgui.push_style_var(imgui.STYLE_WINDOW_PADDING, (0, 0))
-        no_scroll_flags = imgui.WINDOW_NO_SCROLLBAR | imgui.WINDOW_NO_SCROLL_WITH_MOUSE
-        imgui.begin_child("##Viewport", size[0], size[1], self.border, no_scroll_flags)
-        image_size = imgui.get_content_region_available()
-        imgui.image(self.render_window.texture_id, 
-                    image_size.x, image_size.y,
-                    (0, 1), (1, 0))
-        # process the events of this widget
+        if size is None:
+            avail = imgui.get_content_region_available()
+            size = (avail.x, avail.y)
+        # there is nothing to display for collapsed viewports
+        if size[0] < 1 or size[1] < 1:
+            return
+        interactor_size = (int(size[0]), int(size[1]))
+        if interactor_size != self._last_set_size:
+            # adjust the size of this interactor before passing any events to it
+            self.interactor.SetSize(*interactor_size)
+            self._last_set_size = interactor_size
+
+        # borderless child windows have no padding, so the style only needs adjusting for a border
+        if self.border:
+            imgui.push_style_var(_WINDOW_PADDING, _PAD)
+        imgui.begin_child("##Viewport", size[0], size[1], self.border, _NO_SCROLL_FLAGS)
+        # process the events of this widget before rendering, so the image already reflects them
         self.process_events()
+        # keep showing the previous texture while the viewport is scrolled out of view
+        if imgui.is_rect_visible(size[0], size[1]) or self.render_window.texture_id is None:
+            self._render_if_needed(size)
+        # the child has no padding, so the image covers its full size
+        imgui.image(self.render_window.texture_id, 
+                    size[0], size[1],
+                    _UV0, _UV1)
         imgui.end_child()
-        imgui.pop_style_var()
-
-    def _process_mouse_events(self, io):
-        if imgui.is_window_hovered():
-            if imgui.is_mouse_clicked(imgui.MOUSE_BUTTON_LEFT):
-                self.interactor.InvokeEvent(vtkCommand.LeftButtonPressEvent)
-            elif imgui.is_mouse_clicked(imgui.MOUSE_BUTTON_RIGHT):
-                self.interactor.InvokeEvent(vtkCommand.RightButtonPressEvent)
-            elif imgui.is_mouse_clicked(imgui.MOUSE_BUTTON_MIDDLE):
-                self.interactor.InvokeEvent(vtkCommand.MiddleButtonPressEvent)
-            elif io.mouse_wheel > 0:
-                self.interactor.InvokeEvent(vtkCommand.MouseWheelForwardEvent)
-            elif io.mouse_wheel < 0:
-                self.interactor.InvokeEvent(vtkCommand.MouseWheelBackwardEvent)
-
-        if imgui.is_mouse_released(imgui.MOUSE_BUTTON_LEFT):
-            self.interactor.InvokeEvent(vtkCommand.LeftButtonReleaseEvent)
-        elif imgui.is_mouse_released(imgui.MOUSE_BUTTON_RIGHT):
-            self.interactor.InvokeEvent(vtkCommand.RightButtonReleaseEvent)
-        elif imgui.is_mouse_released(imgui.MOUSE_BUTTON_MIDDLE):
-            self.interactor.InvokeEvent(vtkCommand.MiddleButtonReleaseEvent)
-        
-        self.interactor.InvokeEvent(vtkCommand.MouseMoveEvent)
+        if self.border:
+            imgui.pop_style_var()
+
+    def _process_mouse_events(self, io, hovered, clicked, moved):
+        wheel = 0.0
+        # wheel motion is only handled while hovering the viewport
+        if hovered:
+            wheel = io.mouse_wheel
+        released = (imgui.is_mouse_released(_MB_L)
+                    | imgui.is_mouse_released(_MB_R) << 1
+                    | imgui.is_mouse_released(_MB_M) << 2)
+        self._dispatch_mouse_events(clicked, released, wheel, moved)
 
     def process_events(self):
         """
@@ -70,10 +116,13 @@ class RendererBackendPyImgui(RendererBackend):
         on rendering.
         """
         # do nothing as long as the mouse pointer is not within the current window or it is not focussed
-        if not imgui.is_window_focused() and not imgui.is_window_hovered():
+        hovered = imgui.is_window_hovered()
+        if not hovered and not imgui.is_window_focused():
             return
-        io = imgui.get_io()
-        io.config_windows_move_from_title_bar_only = True # do not drag the window when clicking on the image
+        io = self._io
+        if io is None:
+            io = self._io = imgui.get_io()
+            io.config_windows_move_from_title_bar_only = True # do not drag the window when clicking on the image
         viewport_pos = imgui.get_cursor_start_pos()
 
         xpos = int(io.mouse_pos.x - viewport_pos.x)
@@ -82,18 +131,26 @@ class RendererBackendPyImgui(RendererBackend):
         ctrl = io.key_ctrl
         shift = io.key_shift
         
-        repeat = 0
-        #if io.mouse_double_clicked[0] or io.mouse_double_clicked[1] or io.mouse_double_clicked[2]:
-        #    repeat = 1
+        # clicks are only handled while hovering the viewport
+        clicked = 0
+        if hovered:
+            clicked = (imgui.is_mouse_clicked(_MB_L)
+                       | imgui.is_mouse_clicked(_MB_R) << 1
+                       | imgui.is_mouse_clicked(_MB_M) << 2)
+        repeat = self._click_repeat(clicked)
 
         if xpos < 0 or ypos < 0:
             return 
         
-        self.interactor.SetEventInformationFlipY(xpos, ypos, ctrl, shift, chr(0), repeat, None)
+        event_info = (xpos, ypos, ctrl, shift, repeat)
+        moved = event_info != self._last_event_info
+        if moved:
+            self._set_event(xpos, ypos, ctrl, shift, _NUL, repeat, None)
+            self._last_event_info = event_info
 
-        self._process_mouse_events(io)
+        self._process_mouse_events(io, hovered, clicked, moved)
         # no keyboard events yet
-        #self._process_keyboard_events(xpos, ypos, ctrl, shift)
+        #self._process_keyboard_events(hovered, xpos, ypos, ctrl, shift)
 
     def show(self,
              title: typ.Optional[str] = None, 
@@ -113,49 +170,89 @@ class RendererBackendPyImgui(RendererBackend):
         import imgui
         from imgui.integrations.glfw import GlfwRenderer
 
-        if not glfw.init():
-            raise ValueError("Could not initialize OpenGL context")
+        if not _SHOW_POOL:
+            if not glfw.init():
+                raise ValueError("Could not initialize OpenGL context")
 
-        # Create a window and its OpenGL context
-        window = glfw.create_window(int(window_size[0]), int(window_size[1]), title or "ImguiPlotter", None, None)
-        glfw.make_context_current(window)
+            # Create a window and its OpenGL context
+            window = glfw.create_window(int(window_size[0]), int(window_size[1]), title or "ImguiPlotter", None, None)
+            if not window:
+                # glfw is terminated on exit, other windows might still be in use
+                raise ValueError("Could not initialize Window")
+            glfw.make_context_current(window)
+            # sync buffer swaps to the display refresh, late frames are allowed to tear
+            # instead of waiting for the next vertical blank if the driver supports it
+            if (glfw.extension_supported("GLX_EXT_swap_control_tear")
+                    or glfw.extension_supported("WGL_EXT_swap_control_tear")):
+                glfw.swap_interval(-1)
+            else:
+                glfw.swap_interval(1)
 
-        if not window:
-            glfw.terminate()
-            raise ValueError("Could not initialize Window")
-        
-        background_color = (0.0, 0.0, 0.0, 1.0)
-        GL.glClearColor(*background_color)
-        imgui.create_context()
-
-        impl = GlfwRenderer(window)
-
-        while not glfw.window_should_close(window):
-            glfw.poll_events()
-            impl.process_inputs()
-            imgui.new_frame()
-            vec = imgui.get_main_viewport().pos
-            imgui.set_next_window_position(vec.x, vec.y, imgui.ONCE)
-            size = imgui.get_main_viewport().size
-            imgui.set_next_window_size(size.x, size.y)
-            imgui.set_next_window_bg_alpha(1.0)
-            window_flags = imgui.WINDOW_NO_BRING_TO_FRONT_ON_FOCUS | \
-                           imgui.WINDOW_NO_TITLE_BAR | \
-                           imgui.WINDOW_NO_DECORATION | \
-                           imgui.WINDOW_NO_RESIZE | \
-                           imgui.WINDOW_NO_MOVE
-                                 
-            imgui.begin("Vtk Viewer", flags=window_flags)
-            self.render()
-            imgui.end()
-
-            imgui.render()
-
-            GL.glClearColor(*background_color)
-            GL.glClear(GL.GL_COLOR_BUFFER_BIT)
-            impl.render(imgui.get_draw_data())
-            glfw.swap_buffers(window)
-
-        impl.shutdown()
-        glfw.terminate()
-      
\ No newline at end of file
+            # creating a context does not replace an already current one
+            context = imgui.create_context()
+            imgui.set_current_context(context)
+            impl = GlfwRenderer(window)
+        else:
+            # reuse the hidden window of a previous call, the contexts might not be current anymore
+            window, impl, context = _SHOW_POOL.pop()
+            glfw.make_context_current(window)
+            imgui.set_current_context(context)
+            glfw.set_window_title(window, title or "ImguiPlotter")
+            glfw.set_window_size(window, int(window_size[0]), int(window_size[1]))
+            glfw.set_window_should_close(window, False)
+            glfw.show_window(window)
+        # the io object is bound to the imgui context
+        self._io = None
+
+        # the clear color is part of the context state and only needs to be set once
+        GL.glClearColor(0.0, 0.0, 0.0, 1.0)
+
+        window_flags = imgui.WINDOW_NO_BRING_TO_FRONT_ON_FOCUS | \
+                       imgui.WINDOW_NO_TITLE_BAR | \
+                       imgui.WINDOW_NO_DECORATION | \
+                       imgui.WINDOW_NO_RESIZE | \
+                       imgui.WINDOW_NO_MOVE
+
+        last_viewport_size = None
+        try:
+            while not glfw.window_should_close(window):
+                # do not spin while idle, any input event wakes the loop up immediately.
+                # The timeout keeps changes made to the scene from other threads showing up
+                glfw.wait_events_timeout(_IDLE_TIMEOUT)
+                impl.process_inputs()
+                imgui.new_frame()
+                viewport = imgui.get_main_viewport()
+                size = viewport.size
+                viewport_size = (size.x, size.y)
+                # follow the size of the main window, the viewer window itself can not be moved or resized
+                if viewport_size != last_viewport_size:
+                    vec = viewport.pos
+                    imgui.set_next_window_position(vec.x, vec.y, imgui.ONCE)
+                    imgui.set_next_window_size(size.x, size.y)
+                    last_viewport_size = viewport_size
+                imgui.set_next_window_bg_alpha(1.0)
+                imgui.begin("Vtk Viewer", flags=window_flags)
+                self.render()
+                imgui.end()
+
+                imgui.render()
+
+                GL.glClear(GL.GL_COLOR_BUFFER_BIT)
+                impl.render(imgui.get_draw_data())
+                glfw.swap_buffers(window)
+        except BaseException:
+            # the imgui frame might not have been finished, so the window is not reused
+            _destroy_window(window, impl, context)
+            raise
+
+        # keep the window and its contexts for subsequent calls, the rendered texture lives in this context
+        if len(_SHOW_POOL) < _SHOW_POOL_SIZE:
+            glfw.hide_window(window)
+            _SHOW_POOL.append((window, impl, context))
+        else:
+            _destroy_window(window, impl, context)
+
+
+# only make the backend available if its imgui bindings are installed
+if imgui:
+    register_backend("pyimgui")(RendererBackendPyImgui)
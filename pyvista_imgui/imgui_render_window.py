@@ -3,8 +3,8 @@ from vtkmodules.vtkRenderingUI import vtkGenericRenderWindowInteractor
 from vtkmodules.vtkCommonCore import vtkCommand
 from vtkmodules.vtkRenderingCore import vtkRenderWindow, vtkRenderWindowInteractor
 
-import enum
-from abc import ABC, abstractmethod
+import time
+from abc import abstractmethod
 from weakref import WeakValueDictionary
 
 import typing as typ
@@ -12,8 +12,29 @@ import typing as typ
 __all__ = ['VTKImguiRenderWindowInteractor', 'RendererBackend', 'register_backend']
 
 
+# vtk event ids dispatched by the backends, resolved once instead of on every frame
+_EV_LBP = vtkCommand.LeftButtonPressEvent
+_EV_LBR = vtkCommand.LeftButtonReleaseEvent
+_EV_RBP = vtkCommand.RightButtonPressEvent
+_EV_RBR = vtkCommand.RightButtonReleaseEvent
+_EV_MBP = vtkCommand.MiddleButtonPressEvent
+_EV_MBR = vtkCommand.MiddleButtonReleaseEvent
+_EV_WF = vtkCommand.MouseWheelForwardEvent
+_EV_WB = vtkCommand.MouseWheelBackwardEvent
+_EV_MM = vtkCommand.MouseMoveEvent
+
+# button events indexed by a bitmask of the (left, right, middle) button states,
+# the button of the lowest set bit takes precedence
+_PRESS_EVENTS = (None, _EV_LBP, _EV_RBP, _EV_LBP, _EV_MBP, _EV_LBP, _EV_RBP, _EV_LBP)
+_RELEASE_EVENTS = (None, _EV_LBR, _EV_RBR, _EV_LBR, _EV_MBR, _EV_LBR, _EV_RBR, _EV_LBR)
+
+
 class RendererBackend(object):
     _backends = WeakValueDictionary()
+
+    # maximum time in seconds between two clicks of a button to be reported as a double click
+    double_click_time = 0.3
+
     def __init__(self, 
                  interactor: vtkRenderWindowInteractor, 
                  render_window: vtkRenderWindow,
@@ -22,6 +43,118 @@ class RendererBackend(object):
         self.render_window = render_window
         self.border = border
 
+        # bind the interactor methods used on every frame once
+        self._invoke = interactor.InvokeEvent
+        self._set_event = interactor.SetEventInformationFlipY
+
+        # state of the last vtk render used to skip redundant renders
+        self._last_size = None
+        self._last_mtime = 0
+        # set whenever events have been passed to the interactor since the last render
+        self._events_dispatched = False
+        # the last size and event information passed to the interactor
+        self._last_set_size = None
+        self._last_event_info = None
+        # imgui's io object, resolved lazily as the imgui context might not exist yet
+        self._io = None
+        # time of the last click of each (left, right, middle) button
+        self._last_click_time = [0.0, 0.0, 0.0]
+
+    def _click_repeat(self, clicked: int) -> int:
+        """
+        Determines the repeat count of the current clicks for the interactor's event information.
+        Double clicks are detected from timestamps, so this does not depend on the frame rate.
+
+        Parameters
+        ----------
+        clicked
+            bitmask of the (left, right, middle) buttons clicked this frame
+
+        Returns
+        -------
+            1 if any of the buttons has been clicked twice within 'double_click_time', 0 otherwise
+        """
+        if not clicked:
+            return 0
+        now = time.monotonic()
+        repeat = 0
+        for i in range(3):
+            if clicked >> i & 1:
+                if now - self._last_click_time[i] < self.double_click_time:
+                    repeat = 1
+                    # do not report a third click as another double click
+                    self._last_click_time[i] = 0.0
+                else:
+                    self._last_click_time[i] = now
+        return repeat
+
+    def _dispatch_mouse_events(self, clicked: int, released: int, wheel: float, moved: bool) -> None:
+        """
+        Passes the mouse state of the current frame to the interactor.
+
+        Parameters
+        ----------
+        clicked
+            bitmask of the (left, right, middle) buttons clicked this frame
+        released
+            bitmask of the (left, right, middle) buttons released this frame
+        wheel
+            the vertical mouse wheel motion, only considered if no button has been clicked
+        moved
+            whether the mouse position or the modifier keys changed since the last frame
+        """
+        press = _PRESS_EVENTS[clicked]
+        if press is None:
+            if wheel > 0:
+                press = _EV_WF
+            elif wheel < 0:
+                press = _EV_WB
+        release = _RELEASE_EVENTS[released]
+
+        if press is not None:
+            self._invoke(press)
+        if release is not None:
+            self._invoke(release)
+
+        # only notify the interactor about mouse movement if anything actually changed
+        if moved or press is not None or release is not None:
+            self._invoke(_EV_MM)
+            self._events_dispatched = True
+
+    def mark_dirty(self) -> None:
+        """
+        Forces the vtk scene to be rendered again on the next frame, e.g. after changing 
+        data in a way that does not update the modification time of any vtk object.
+        """
+        self._events_dispatched = True
+
+    def _render_if_needed(self, size: tuple[int, int]) -> bool:
+        """
+        Renders the vtk scene into the texture unless neither the viewport size nor the scene
+        have changed and no events have been dispatched since the last render.
+
+        Parameters
+        ----------
+        size
+            the requested viewport size
+
+        Returns
+        -------
+            True if the scene has been rendered, False if the previous texture is still valid.
+        """
+        if (size == self._last_size
+                and not self._events_dispatched
+                and self.render_window.scene_mtime() == self._last_mtime):
+            return False
+
+        self.render_window.size = size
+        self.render_window.render()
+        self._last_size = size
+        # rendering may modify the scene itself (e.g. clipping ranges) so query afterwards
+        self._last_mtime = self.render_window.scene_mtime()
+        self._events_dispatched = False
+        return True
+
     @abstractmethod
     def render(self) -> None:
         pass
@@ -76,7 +209,14 @@ class VTKImguiRenderWindowInteractor(object):
 
         self.interactor = vtkGenericRenderWindowInteractor()
 
+        # backends are only registered if their imgui bindings could be imported
+        if imgui_backend not in RendererBackend._backends:
+            raise ModuleNotFoundError(f"The imgui backend '{imgui_backend}' is not available. "
+                                      "Make sure the required imgui bindings are installed.")
         self.imgui_backend = RendererBackend.from_name(imgui_backend, self.interactor, self.ren_win, border=border)
+        # the backend is fixed, so resolve its per-frame methods once
+        self._render_impl = self.imgui_backend.render
+        self._process_events_impl = self.imgui_backend.process_events
 
         # do not render unless explicitly requested, as imgui has control over the event loop
         self.interactor.EnableRenderOff()
@@ -88,11 +228,16 @@ class VTKImguiRenderWindowInteractor(object):
         """
         if attr == '__vtk__':
             return lambda t=self.interactor: t
-        elif hasattr(self.interactor, attr):
-            return getattr(self.interactor, attr)
-        else:
+        try:
+            value = getattr(self.interactor, attr)
+        except AttributeError:
             raise AttributeError(self.__class__.__name__ +
-                  " has no attribute named " + attr)
+                  " has no attribute named " + attr) from None
+        # cache resolved methods, so subsequent lookups do not end up here again.
+        # Other values (e.g. vtk's snake_case properties) have to be read from the vtk object every time
+        if callable(value):
+            self.__dict__[attr] = value
+        return value
 
     def render_imgui(self, size: typ.Optional[tuple[int, int]] = None) -> None:
         """
@@ -106,12 +251,20 @@ class VTKImguiRenderWindowInteractor(object):
             the size of the result in the ui in pixels, 
             if None (default) the maximum available size is used.
         """
-        self.imgui_backend.render(size)
+        self._render_impl(size)
 
     def process_events(self) -> None:
         """
         Handle events by passing them to the underlying vtk interactor. This method is called automatically
         on rendering.
         """
-        self.imgui_backend.process_events()
+        self._process_events_impl()
+
+    def mark_dirty(self) -> None:
+        """
+        Forces the vtk scene to be rendered again the next time 'render_imgui' is called. 
+        Changes to vtk objects are detected automatically, so this is only required for modifications
+        that bypass vtk's modification times.
+        """
+        self.imgui_backend.mark_dirty()
 
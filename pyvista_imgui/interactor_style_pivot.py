@@ -1,4 +1,5 @@
 from __future__ import annotations
+import math
 from vtkmodules.util import numpy_support as VN
 from vtkmodules.vtkCommonCore import vtkFloatArray
 from vtkmodules.vtkFiltersSources import vtkSphereSource
@@ -10,7 +11,7 @@ import numpy as np
 from numpy.typing import ArrayLike
 from pyvista.plotting.render_window_interactor import _style_factory
 import pyvista as pv
-from typing import Any, Sequence
+from typing import Any
 
 
 class DefaultInteractorKeybindsMixin:
@@ -28,10 +29,9 @@ class DefaultInteractorKeybindsMixin:
         event_pos = interactor.GetEventPosition()
         self.FindPokedRenderer(event_pos[0], event_pos[1])
 
-        try:
-            self.__key_dispatcher[key]()
-        except KeyError:
-            pass
+        handler = self.__key_dispatcher.get(key)
+        if handler is not None:
+            handler()
 
     def _fly_to_point(self) -> None:
         interactor = self.GetInteractor()
@@ -63,33 +63,32 @@ class DefaultInteractorKeybindsMixin:
 
 __all__ = ["InteractorStylePivot"]
 
-def _normalize(v: ArrayLike) -> ArrayLike:
-    """Normalize the array
+def _normalize3(v: ArrayLike) -> np.ndarray:
+    """Normalize a vector of 3 components
 
     Args:
-        v: _description_
+        v: the vector to normalize
 
     Returns:
-        _description_
+        the normalized vector, or the vector itself if it has zero length
     """
-    v = np.asarray(v)
-    norm = np.linalg.norm(v)
+    x, y, z = v
+    norm = math.sqrt(x * x + y * y + z * z)
     if norm == 0:
-        return v
-    return v / norm
+        return np.array((x, y, z), dtype=float)
+    inv = 1.0 / norm
+    return np.array((x * inv, y * inv, z * inv))
 
 
-def _create_pivot_sphere(radius: float = 0.25, resolution: int = 16) -> pv.Actor:
-    sphere = vtkSphereSource()
-    sphere.SetRadius(radius)
-    sphere.SetThetaResolution(resolution)
-    sphere.SetPhiResolution(resolution)
+def _create_pivot_sphere(sphere: vtkSphereSource) -> pv.Actor:
+    """
+    Builds the actor of the pivot sphere on top of the given sphere source. The radius and resolution 
+    of the source can be changed afterwards, the pipeline updates the mesh on the next render.
+    """
     norms = vtkTriangleMeshPointNormals()
     norms.SetInputConnection(sphere.GetOutputPort())
-    norms.Update()
     sphere_mapper = vtkOpenGLPolyDataMapper()
     sphere_mapper.SetInputConnection(norms.GetOutputPort())
-    del sphere
 
     pivot_sphere = pv.Actor()
     pivot_sphere.mapper = sphere_mapper
@@ -137,6 +136,11 @@ def _create_pivot_sphere(radius: float = 0.25, resolution: int = 16) -> pv.Actor
     return pivot_sphere
 
 
+# offset added to the squared screen distances when scoring pivot candidates,
+# the larger it is, the more the depth dominates the distance to the mouse pointer
+_PIVOT_SCREEN_WEIGHT_OFFSET = 101
+
+
 _TrackBallStyle = _style_factory('TrackballCamera')
 
 
@@ -172,13 +176,26 @@ class InteractorStylePivot(DefaultInteractorKeybindsMixin, _TrackBallStyle):
         self._pivot_sphere_resolution = pivot_sphere_resolution
         self._pivot_sphere_visible = False
 
-        self._pivot_sphere = _create_pivot_sphere(pivot_sphere_radius, pivot_sphere_resolution)
+        # the sphere source and actor are created on first use
+        self._pivot_sphere_source = None
+        self._pivot_sphere = None
 
         self.left_down = False
         self.right_down = False
         self.state = 0
-        self.pivot = [0, 0, 0]
+        self.pivot = np.zeros(3)
         self.tolerance = 0.002
+        # translation vectors of the current pan gesture
+        self._pan_vectors = None
+        # buffers reused by each pivot pick
+        self._zbuffer = vtkFloatArray()
+        self._world = np.zeros(4)
+        # event position and camera modification time after the last wheel step
+        self._last_wheel_state = None
+        # transform reused by each rotation step
+        self._rotation_transform = vtkTransform()
+        # pivot candidate weights of the depth square per extent
+        self._screen_weights: dict[int, np.ndarray] = {}
 
     @property
     def pivot_sphere_radius(self) -> float:
@@ -186,14 +203,12 @@ class InteractorStylePivot(DefaultInteractorKeybindsMixin, _TrackBallStyle):
 
     @pivot_sphere_radius.setter
     def pivot_sphere_radius(self, radius: float) -> None:
-        show_again = False
-        if self._pivot_sphere_visible:
-            show_again = True
-            self._hide_pivot_sphere()
+        if radius == self._pivot_sphere_radius:
+            return
         self._pivot_sphere_radius = radius
-        self._pivot_sphere = _create_pivot_sphere(self._pivot_sphere_radius, self._pivot_sphere_resolution)
-        if show_again:
-            self._show_pivot_sphere()
+        # update the existing mesh instead of rebuilding the actor
+        if self._pivot_sphere_source is not None:
+            self._pivot_sphere_source.SetRadius(radius)
 
     @property
     def pivot_sphere_resolution(self) -> int:
@@ -201,14 +216,27 @@ class InteractorStylePivot(DefaultInteractorKeybindsMixin, _TrackBallStyle):
 
     @pivot_sphere_resolution.setter
     def pivot_sphere_resolution(self, resolution: int) -> None:
-        show_again = False
-        if self._pivot_sphere_visible:
-            show_again = True
-            self._hide_pivot_sphere()
+        if resolution == self._pivot_sphere_resolution:
+            return
         self._pivot_sphere_resolution = resolution
-        self._pivot_sphere = _create_pivot_sphere(self._pivot_sphere_radius, self._pivot_sphere_resolution)
-        if show_again:
-            self._show_pivot_sphere()
+        if self._pivot_sphere_source is not None:
+            self._pivot_sphere_source.SetThetaResolution(resolution)
+            self._pivot_sphere_source.SetPhiResolution(resolution)
+
+    @property
+    def pivot_sphere(self) -> pv.Actor:
+        """
+        The actor of the sphere displayed at the pivot point. It is created on first access.
+        """
+        if self._pivot_sphere is None:
+            # each style owns its pipeline, as the mapper's graphics resources are bound to a render window
+            sphere = vtkSphereSource()
+            sphere.SetRadius(self._pivot_sphere_radius)
+            sphere.SetThetaResolution(self._pivot_sphere_resolution)
+            sphere.SetPhiResolution(self._pivot_sphere_resolution)
+            self._pivot_sphere_source = sphere
+            self._pivot_sphere = _create_pivot_sphere(sphere)
+        return self._pivot_sphere
 
     @property
     def tolerance(self) -> float:
@@ -271,47 +299,53 @@ class InteractorStylePivot(DefaultInteractorKeybindsMixin, _TrackBallStyle):
         """
         self.FindPokedRenderer(event_pos[0], event_pos[1])
         renwin = self.GetInteractor().GetRenderWindow()
-        win_size = np.asarray(renwin.GetSize())
-        diagonal_len = np.sqrt(np.sum(win_size**2))
-        vfa = vtkFloatArray()
-        extent = int(np.ceil(self.tolerance * diagonal_len))
-        renwin.GetZbufferData(event_pos[0] - extent, event_pos[1] - extent, event_pos[0]+extent, event_pos[1]+extent, vfa)
+        diagonal_len = math.hypot(*renwin.GetSize())
+        extent = int(math.ceil(self.tolerance * diagonal_len))
+        renwin.GetZbufferData(event_pos[0] - extent, event_pos[1] - extent, event_pos[0]+extent, event_pos[1]+extent, self._zbuffer)
         size = extent * 2 + 1
-        data = VN.vtk_to_numpy(vfa).reshape(size, size) - 1.0
-
-        nonzero = np.nonzero(data)
-        if len(nonzero[0]) > 0:
-            distances_screen = (nonzero[0] - extent) ** 2 + (nonzero[1] - extent) ** 2
-            distances_scene = data[nonzero]
-
-            distances_total = distances_scene * (distances_screen + 1 + 100) #distances_screen * 0.5 + distances_scene * 0.5
-
-            #print("distances_scene", distances_scene.min(), distances_scene.max())
-            #print("distances_screen", distances_screen.min(), distances_screen.max())
-            min_id = np.argmin(distances_total)
-            nearest_index = (nonzero[0][min_id], nonzero[1][min_id])
-            event_pos = (event_pos[0] - extent + nearest_index[0], event_pos[1] - extent + nearest_index[1])
-            renderer = self.GetCurrentRenderer()
-            world = np.zeros(4)
-            self.ComputeDisplayToWorld(renderer, *event_pos, data[nearest_index] + 1.0, world)
-            for i in range(3):
-                self.pivot[i] = world[i] / world[3]
-            return True
-        return False
+        # vtk_to_numpy returns a view, the buffer is overwritten by the next call anyway
+        data = VN.vtk_to_numpy(self._zbuffer).reshape(size, size)
+        np.subtract(data, 1.0, out=data)
+
+        # score every pixel of the square at once, the (negative) depth offsets are weighted by the 
+        # squared screen distance to the event position. Background pixels (depth 1.0) score 0 
+        # while all others score below 0, so no explicit mask is required
+        weights = self._screen_weights.get(extent)
+        if weights is None:
+            # the extent only changes with the window size, so the weights are built once per extent
+            ys, xs = np.ogrid[-extent:extent+1, -extent:extent+1]
+            weights = self._screen_weights[extent] = (xs * xs + ys * ys + _PIVOT_SCREEN_WEIGHT_OFFSET).astype(np.float32)
+        distances_total = data * weights
+        min_id = distances_total.argmin()
+        if distances_total.flat[min_id] == 0:
+            return False
+
+        # the depth buffer is stored row by row, so the row is the y offset
+        iy, ix = divmod(int(min_id), size)
+        event_pos = (event_pos[0] - extent + ix, event_pos[1] - extent + iy)
+        renderer = self.GetCurrentRenderer()
+        world = self._world
+        self.ComputeDisplayToWorld(renderer, *event_pos, data[iy, ix] + 1.0, world)
+        np.divide(world[:3], world[3], out=self.pivot)
+        return True
 
     def _scale_pivot_sphere(self) -> None:
-        camera = self.GetCurrentRenderer().GetActiveCamera()
-        from_pos = camera.GetPosition()
-        vec = np.asarray(self.pivot) - np.asarray(from_pos)
-        at_v = _normalize(camera.GetDirectionOfProjection())
-        s = 0.02 * np.dot(at_v, vec)
+        renderer = self.GetCurrentRenderer()
+        if renderer is None:
+            return
+        camera = renderer.GetActiveCamera()
+        # distance of the pivot along the (normalized) direction of projection
+        cx, cy, cz = camera.GetPosition()
+        px, py, pz = self.pivot
+        ax, ay, az = camera.GetDirectionOfProjection()
+        s = 0.02 * (ax * (px - cx) + ay * (py - cy) + az * (pz - cz))
         self._pivot_sphere.SetScale(s, s, s)
 
     def _show_pivot_sphere(self) -> None:
         """
         Show a sphere at the pivot position
         """
-        self._pivot_sphere.SetPosition(self.pivot)
+        self.pivot_sphere.SetPosition(self.pivot)
         # calculate scale so focus sphere always is the same size on the screen
         self._scale_pivot_sphere()
         self._focus_sphere_renderer = self.GetCurrentRenderer()
@@ -325,13 +359,15 @@ class InteractorStylePivot(DefaultInteractorKeybindsMixin, _TrackBallStyle):
         Hide the sphere if it is visible
         """
         sphere_renderer = getattr(self, '_focus_sphere_renderer', None)
-        if sphere_renderer:
+        if sphere_renderer and self._pivot_sphere is not None:
             sphere_renderer.RemoveActor(self._pivot_sphere)
             self._pivot_sphere_visible = False
 
     def _left_button_press_event(self, obj: Any, event: Any) -> None:
         click_pos = self.GetInteractor().GetEventPosition()
         self.left_down = True
+        # shift + left starts a pan as well, so every gesture computes its own pan vectors
+        self._pan_vectors = None
         if not self.right_down:
             self._set_pivot(click_pos)
             self._show_pivot_sphere()
@@ -342,6 +378,7 @@ class InteractorStylePivot(DefaultInteractorKeybindsMixin, _TrackBallStyle):
     def _right_button_press_event(self, obj: Any, event: Any) -> None:
         click_pos = self.GetInteractor().GetEventPosition()
         self.right_down = True
+        self._pan_vectors = None
         if not self.left_down:
             self._set_pivot(click_pos)
             self._show_pivot_sphere()
@@ -350,6 +387,7 @@ class InteractorStylePivot(DefaultInteractorKeybindsMixin, _TrackBallStyle):
 
     def _middle_button_press_event(self, obj: Any, event: Any) -> None:
         click_pos = self.GetInteractor().GetEventPosition()
+        self._pan_vectors = None
         self._set_pivot(click_pos)
         self._show_pivot_sphere()
         self.last_pos = click_pos
@@ -372,59 +410,73 @@ class InteractorStylePivot(DefaultInteractorKeybindsMixin, _TrackBallStyle):
         super().OnRightButtonUp()
 
     def _mousewheel_forward_event(self, obj: Any, event: Any) -> None:
-        event_pos = self.GetInteractor().GetEventPosition()
-        self.FindPokedRenderer(event_pos[0], event_pos[1])
-        ret = self._set_pivot(event_pos)
-        if ret != 0:
-            camera = self.GetCurrentRenderer().GetActiveCamera()
-            self.StartDolly()
-            delta = self.GetMotionFactor() * -0.005 * self.GetMouseWheelMotionFactor()
-            if camera.GetParallelProjection():
-                camera.SetParallelScale(camera.GetParallelScale / delta)
-            else:
-                self._dolly_camera(delta)
-            self.EndDolly()
+        self._wheel_dolly(-1.0)
 
     def _mousewheel_backward_event(self, obj: Any, event: Any) -> None:
+        self._wheel_dolly(1.0)
+
+    def _wheel_dolly(self, direction: float) -> None:
+        """
+        Dolly towards (direction < 0) or away from (direction > 0) the pivot point under the mouse pointer.
+        """
         event_pos = self.GetInteractor().GetEventPosition()
-        self.FindPokedRenderer(event_pos[0], event_pos[1])
-        ret = self._set_pivot(event_pos)
+        renderer = self.GetCurrentRenderer()
+        if (renderer is not None and self._last_wheel_state is not None
+                and self._last_wheel_state == (event_pos, renderer.GetActiveCamera().GetMTime())):
+            # neither the mouse nor the camera moved apart from the previous wheel step, 
+            # which dollied along the ray through the pivot, so it is still under the mouse pointer
+            ret = True
+        else:
+            # _set_pivot finds the poked renderer
+            ret = self._set_pivot(event_pos)
         if ret != 0:
             camera = self.GetCurrentRenderer().GetActiveCamera()
             self.StartDolly()
-            delta = self.GetMotionFactor() * 0.005 * self.GetMouseWheelMotionFactor()
+            delta = self.GetMotionFactor() * 0.005 * direction * self.GetMouseWheelMotionFactor()
             if camera.GetParallelProjection():
-                camera.SetParallelScale(camera.GetParallelScale / delta)
+                # scale the view by the same factor the distance to the pivot changes in _dolly_camera
+                camera.SetParallelScale(camera.GetParallelScale() * (1.0 + 4.0 * delta))
+                # scaling is done around the focal point, so the pivot has to be picked again
+                self._last_wheel_state = None
             else:
                 self._dolly_camera(delta)
+                self._last_wheel_state = (event_pos, camera.GetMTime())
             self.EndDolly()
 
     def _mouse_move_event(self, obj: Any, event: Any) -> None:
         interactor = self.GetInteractor()
         event_pos = interactor.GetEventPosition()
-        self.FindPokedRenderer(event_pos[0], event_pos[1])
+        state = self.GetState()
 
-        if self.GetState() == 1:
+        if state == 1:
             # custom rotation
             self._rotate()
-        elif self.GetState() == 2:
+        elif state == 2:
             self._pan()
-        elif self.GetState() == 3:
+        elif state == 3:
             # custom spin
             self._spin()
-        elif self.GetState() == 4:
+        elif state == 4:
             self._dolly()
         else:
+            # the renderer of an active interaction has been found on the button press already
+            self.FindPokedRenderer(event_pos[0], event_pos[1])
             super().OnMouseMove()
 
         # rescale the pivot sphere upon each mouse move so it is always the same size on screen
-        self._scale_pivot_sphere()
+        if self._pivot_sphere_visible:
+            self._scale_pivot_sphere()
         self.last_pos = event_pos
         self.GetInteractor().Render()
 
-    def _normalize_mouse(self, coord: tuple[int, int]) -> None:
-        size = self.GetInteractor().GetRenderWindow().GetSize()
-        return -1.0 + 2.0 * coord[0] / size[0], -1.0 + 2.0 * coord[1] / size[1]
+    def _normalized_mouse_delta(self) -> tuple[float, float]:
+        """
+        The mouse motion since the last event in normalized device coordinates.
+        """
+        interactor = self.GetInteractor()
+        event_pos = interactor.GetEventPosition()
+        size = interactor.GetRenderWindow().GetSize()
+        return 2.0 * (event_pos[0] - self.last_pos[0]) / size[0], 2.0 * (event_pos[1] - self.last_pos[1]) / size[1]
 
     def _get_right_v_and_up_v(self, pivot: ArrayLike, camera: pv.Camera) -> tuple[float, float]:
         cam_pos = np.array(camera.GetPosition())
@@ -432,33 +484,31 @@ class InteractorStylePivot(DefaultInteractorKeybindsMixin, _TrackBallStyle):
         vector_to_pivot = pivot - cam_pos
 
         if self.translation_plane_normal is None:
-            view_plane_normal = _normalize(camera.GetViewPlaneNormal())
+            view_plane_normal = _normalize3(camera.GetViewPlaneNormal())
         else:
-            view_plane_normal = _normalize(self.translation_plane_normal)
+            view_plane_normal = _normalize3(self.translation_plane_normal)
 
         l = -np.dot(vector_to_pivot, view_plane_normal)
-        view_angle = camera.GetViewAngle() * np.pi / 180
+        view_angle = math.radians(camera.GetViewAngle())
 
         size = self.GetInteractor().GetRenderWindow().GetSize()
-        scalex = size[0] / size[1] * ((2 * l * np.tan(view_angle / 2)) / 2)
-        scaley = ((2 * l * np.tan(view_angle / 2)) / 2)
+        scaley = l * math.tan(view_angle / 2)
+        scalex = size[0] / size[1] * scaley
 
         view_up = camera.GetViewUp()
-        right_v = _normalize(np.cross(view_up, view_plane_normal)) * scalex
-        up_v = _normalize(np.cross(view_plane_normal, right_v)) * scaley
+        right_v = _normalize3(np.cross(view_up, view_plane_normal)) * scalex
+        up_v = _normalize3(np.cross(view_plane_normal, right_v)) * scaley
 
         return right_v, up_v
 
     def _translate_camera(self, translation: ArrayLike) -> None:
         camera = self.GetCurrentRenderer().GetActiveCamera()
-        cam_pos = np.asarray(camera.GetPosition())
-        cam_focal = np.asarray(camera.GetFocalPoint())
-
-        cam_pos_new = cam_pos + translation
-        cam_focal_new = cam_focal + translation
+        tx, ty, tz = translation
+        cx, cy, cz = camera.GetPosition()
+        fx, fy, fz = camera.GetFocalPoint()
 
-        camera.SetPosition(cam_pos_new)
-        camera.SetFocalPoint(cam_focal_new)
+        camera.SetPosition(cx + tx, cy + ty, cz + tz)
+        camera.SetFocalPoint(fx + tx, fy + ty, fz + tz)
 
         if self.GetAutoAdjustCameraClippingRange():
             self.GetCurrentRenderer().ResetCameraClippingRange()
@@ -472,12 +522,11 @@ class InteractorStylePivot(DefaultInteractorKeybindsMixin, _TrackBallStyle):
         view_up = camera.GetViewUp()
         position = camera.GetPosition()
 
-        axis = [0, 0, 0]
-        axis[0] = -1 * camera.GetViewTransformMatrix().GetElement(0,0)
-        axis[1] = -1 * camera.GetViewTransformMatrix().GetElement(0,1)
-        axis[2] = -1 * camera.GetViewTransformMatrix().GetElement(0,2)
+        # the negated first row of the view transform is the camera's left axis
+        get_element = camera.GetViewTransformMatrix().GetElement
+        axis = (-get_element(0, 0), -get_element(0, 1), -get_element(0, 2))
 
-        transform = vtkTransform()
+        transform = self._rotation_transform
         transform.Identity()
         transform.Translate(*point)
         transform.RotateWXYZ(azimuth, view_up)
@@ -499,16 +548,15 @@ class InteractorStylePivot(DefaultInteractorKeybindsMixin, _TrackBallStyle):
             self.GetCurrentRenderer().UpdateLightsGeometryToFollowCamera()
 
     def _pan(self) -> None:
-        event_pos = self.GetInteractor().GetEventPosition()
-        event_pos_normalized = self._normalize_mouse(event_pos)
-        last_pos_normalized = self._normalize_mouse(self.last_pos)
-
-        deltax = event_pos_normalized[0] - last_pos_normalized[0]
-        deltay = event_pos_normalized[1] - last_pos_normalized[1]
+        deltax, deltay = self._normalized_mouse_delta()
 
         camera = self.GetCurrentRenderer().GetActiveCamera()
 
-        right_v, up_v = self._get_right_v_and_up_v(self.pivot, camera)
+        if self._pan_vectors is None:
+            # panning only translates the camera parallel to the view plane, 
+            # so the vectors stay the same for the whole gesture
+            self._pan_vectors = self._get_right_v_and_up_v(self.pivot, camera)
+        right_v, up_v = self._pan_vectors
         offset_v = (-deltax * right_v + (-deltay * up_v))
 
         self._translate_camera(offset_v)
@@ -529,24 +577,15 @@ class InteractorStylePivot(DefaultInteractorKeybindsMixin, _TrackBallStyle):
 
     def _dolly_camera(self, delta: float) -> None:
         camera = self.GetCurrentRenderer().GetActiveCamera()
-        cam_pos = np.array(camera.GetPosition())
+        cx, cy, cz = camera.GetPosition()
+        px, py, pz = self.pivot
 
-        move = np.asarray(self.pivot) - cam_pos
-        offset = move * delta * -4
-        self._translate_camera(offset)
-
-        if self.GetAutoAdjustCameraClippingRange():
-            self.GetCurrentRenderer().ResetCameraClippingRange()
-
-        if self.GetInteractor().GetLightFollowCamera():
-            self.GetCurrentRenderer().UpdateLightsGeometryToFollowCamera()
+        factor = delta * -4
+        # _translate_camera also updates the clipping range and lights
+        self._translate_camera(((px - cx) * factor, (py - cy) * factor, (pz - cz) * factor))
 
     def _dolly(self) -> None:
-        event_pos = self.GetInteractor().GetEventPosition()
-        event_pos_normalized = self._normalize_mouse(event_pos)
-        last_pos_normalized = self._normalize_mouse(self.last_pos)
-
-        delta = event_pos_normalized[1] - last_pos_normalized[1]
+        delta = self._normalized_mouse_delta()[1]
         self._dolly_camera(delta)
 
     def _spin(self) -> None:
@@ -555,9 +594,9 @@ class InteractorStylePivot(DefaultInteractorKeybindsMixin, _TrackBallStyle):
         event_pos = self.GetInteractor().GetEventPosition()
         last_event_pos = self.last_pos
 
-        new_angle = np.degrees(np.arctan2(event_pos[1] - center[1], event_pos[0]-center[0]))
+        new_angle = math.degrees(math.atan2(event_pos[1] - center[1], event_pos[0]-center[0]))
 
-        old_angle = np.degrees(np.arctan2(last_event_pos[1] - center[1], last_event_pos[0] - center[0]))
+        old_angle = math.degrees(math.atan2(last_event_pos[1] - center[1], last_event_pos[0] - center[0]))
 
         camera = self.GetCurrentRenderer().GetActiveCamera()
 
@@ -580,6 +619,8 @@ class InteractorStylePivot(DefaultInteractorKeybindsMixin, _TrackBallStyle):
     def remove_observers(self) -> None:
         for obs in self._observers:
             self.RemoveObserver(obs)
+        # forget the removed tags, so they are not removed again
+        self._observers.clear()
 
 
 
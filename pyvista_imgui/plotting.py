@@ -3,37 +3,30 @@ import pyvista as pv
 from .imgui_render_window import VTKImguiRenderWindowInteractor
 from pyvista import global_theme
 from pyvista.plotting.render_window_interactor import RenderWindowInteractor
+from pyvista.plotting.widgets import WidgetHelper
+from pyvista.plotting.plotting import _ALL_PLOTTERS
 import typing as typ
 from functools import wraps
-import contextlib
+import types
+from threading import Thread
 import numpy as np
 from collections.abc import Sequence
 from vtkmodules.vtkCommonDataModel import vtkPolyData
 from vtkmodules.vtkRenderingCore import vtkGlyph3DMapper
+from vtkmodules.vtkFiltersCore import vtkCleanPolyData
 
 __all__ = ['ImguiPlotter']
 
-# monkey patch the pointgaussianmapper to disable the automatic rgba conversion of the colors
 from pyvista.plotting.mapper import PointGaussianMapper
 
 def _as_rgba_disabled(self):
-    """Patched method to disable the rgba conversion for the PointGaussianMapper
+    """Replacement method to disable the rgba conversion for the PointGaussianMapper
     """
     if self.color_mode == 'direct':
         return
 
-PointGaussianMapper.as_rgba = _as_rgba_disabled
 
 
-@contextlib.contextmanager
-def _no_base_plotter_init():
-    init = pv.BasePlotter.__init__
-    pv.BasePlotter.__init__ = lambda *args, **kwargs: None
-    try:
-        yield
-    finally:
-        pv.BasePlotter.__init__ = init
-
 class ImguiPlotter(VTKImguiRenderWindowInteractor, pv.BasePlotter):
     """
     This class extends pyvista's BasePlotter making it available
@@ -49,9 +42,9 @@ class ImguiPlotter(VTKImguiRenderWindowInteractor, pv.BasePlotter):
     Parameters
     ----------
     multi_samples, optional
-        The number of multi-samples used to mitigate aliasing. 4 is a
-        good default but 8 will have better results with a potential
-        impact on performance.. Defaults to None.
+        Kept for compatibility with pyvista's Plotter. Multisampling is not
+        available as vtk renders into a texture, so any value larger than 1
+        enables FXAA instead, which is a single post-processing pass. Defaults to None.
     line_smoothing, optional
         Enable line smoothing, by default False
     point_smoothing, optional
@@ -73,52 +66,48 @@ class ImguiPlotter(VTKImguiRenderWindowInteractor, pv.BasePlotter):
                  polygon_smoothing: bool = False,
                  background: bool = False,
                  imgui_backend: typ.Optional[str] = None,
+                 multi_samples: typ.Optional[int] = None,
                  **kwargs):
         
         self._initialized = False
         
         # imgui has it's own border functionality so ignore the vtk one
         border = kwargs.pop("border", False)
-        with _no_base_plotter_init():
-            VTKImguiRenderWindowInteractor.__init__(self, border=border, imgui_backend=imgui_backend)
+        # VTKImguiRenderWindowInteractor.__init__ does not chain to the next class in the mro,
+        # so both bases are initialized explicitly
+        VTKImguiRenderWindowInteractor.__init__(self, border=border, imgui_backend=imgui_backend)
         pv.BasePlotter.__init__(self, **kwargs)
         self.title = title or "ImguiPlotter"
         self.suppress_rendering = True # disable rendering as the event loop is controlled by imgui
 
-        self.render_window.SetMultiSamples(0)
+        render_window = self.render_window
+        renderers = self.renderers
+
+        render_window.SetMultiSamples(0)
         if line_smoothing:
-            self.render_window.LineSmoothingOn()
+            render_window.LineSmoothingOn()
         if point_smoothing:
-            self.render_window.PointSmoothingOn()
+            render_window.PointSmoothingOn()
         if polygon_smoothing:
-            self.render_window.PolygonSmoothingOn()
+            render_window.PolygonSmoothingOn()
 
-        for renderer in self.renderers:
-            self.render_window.AddRenderer(renderer)
+        # resolve the method through the texture render window's attribute forwarding only once
+        add_renderer = render_window.AddRenderer
+        for renderer in renderers:
+            add_renderer(renderer)
 
         # Add the shadow renderer to allow us to capture interactions within
         # a given viewport
         # https://vtk.org/pipermail/vtkusers/2018-June/102030.html
-        number_or_layers = self.render_window.GetNumberOfLayers()
+        shadow_renderer = renderers.shadow_renderer
+        number_or_layers = render_window.GetNumberOfLayers()
         current_layer = self.renderer.GetLayer()
-        self.render_window.SetNumberOfLayers(number_or_layers + 1)
-        self.render_window.AddRenderer(self.renderers.shadow_renderer)
-        self.renderers.shadow_renderer.SetLayer(current_layer + 1)
-        self.renderers.shadow_renderer.SetInteractive(False)  # never needs to capture
-        
-        self.background_color = self.theme.background
-        self._setup_interactor()
-
-        # # Add the shadow renderer to allow us to capture interactions within
-        # # a given viewport
-        # # https://vtk.org/pipermail/vtkusers/2018-June/102030.html
-        number_or_layers = self.render_window.GetNumberOfLayers()
-        current_layer = self.renderer.GetLayer()
-        self.render_window.SetNumberOfLayers(number_or_layers + 1)
-        self.render_window.AddRenderer(self.renderers.shadow_renderer)
-        self.renderers.shadow_renderer.SetLayer(current_layer + 1)
-        self.renderers.shadow_renderer.SetInteractive(False)  # never needs to capture
+        render_window.SetNumberOfLayers(number_or_layers + 1)
+        add_renderer(shadow_renderer)
+        shadow_renderer.SetLayer(current_layer + 1)
+        shadow_renderer.SetInteractive(False)  # never needs to capture
 
+        self._setup_interactor()
 
         # Set window size
         self._window_size_unset = False
@@ -138,13 +127,18 @@ class ImguiPlotter(VTKImguiRenderWindowInteractor, pv.BasePlotter):
         self.set_background(self._theme.background)
 
         if self._theme.depth_peeling.enabled:
+            # enables depth peeling on the active renderer and the alpha bit planes of the window
             if self.enable_depth_peeling():
+                active_renderer = self.renderer
                 for renderer in self.renderers:
-                    renderer.enable_depth_peeling()
+                    if renderer is not active_renderer:
+                        renderer.enable_depth_peeling()
 
         # set anti_aliasing based on theme
         if self.theme.anti_aliasing:
             self.enable_anti_aliasing(self.theme.anti_aliasing)
+        elif multi_samples is not None and multi_samples > 1:
+            self.enable_anti_aliasing('fxaa')
 
         self._run_background = background
         self._thread = None
@@ -168,10 +162,12 @@ class ImguiPlotter(VTKImguiRenderWindowInteractor, pv.BasePlotter):
 
 
     def __del__(self):
-        # We have to check here if the plotter was only partially initialized
+        # We have to check here if the plotter was only partially initialized, 
+        # e.g. if the imgui backend is not available there is nothing to clean up
+        if not getattr(self, '_initialized', False):
+            return
         self.deep_clean()
-        if self._initialized:
-            del self.renderers
+        del self.renderers
 
     @property
     def window_size(self) -> tuple[int, int]:  # numpydoc ignore=RT01
@@ -207,9 +203,6 @@ class ImguiPlotter(VTKImguiRenderWindowInteractor, pv.BasePlotter):
             Unused argument.
 
         """
-        from pyvista.plotting.widgets import WidgetHelper
-        from pyvista.plotting.plotting import _ALL_PLOTTERS
-        
         # optionally run just prior to exiting the plotter
         if self._before_close_callback is not None:
             self._before_close_callback(self)
@@ -248,11 +241,33 @@ class ImguiPlotter(VTKImguiRenderWindowInteractor, pv.BasePlotter):
     @wraps(pv.BasePlotter.add_actor)
     def add_actor(self, *args, **kwargs):
         """
-        Override to ignore the 'render' argument
+        Override to ignore the 'render' argument. 
+
+        Unnamed actors are given a unique name, so looking for an existing actor 
+        to replace is skipped for them unless 'remove_existing_actor' is passed explicitly.
         """
         kwargs["render"] = False # never render as this is not controlled by vtk any more
+        name = args[2] if len(args) > 2 else kwargs.get("name")
+        if name is None and len(args) < 7:
+            kwargs.setdefault("remove_existing_actor", False)
         return pv.BasePlotter.add_actor(self, *args, **kwargs)
     
+    @property
+    def mapper(self):
+        """
+        The mapper most recently created by this plotter.
+        """
+        # read the instance dict directly, __getattr__ would forward a missing attribute to the interactor
+        return self.__dict__.get('_mapper')
+
+    @mapper.setter
+    def mapper(self, mapper) -> None:
+        # pyvista assigns each new mapper here before setting its scalars, so the rgba conversion of 
+        # point gaussian colors is disabled on the mappers of this plotter only
+        if isinstance(mapper, PointGaussianMapper):
+            mapper.as_rgba = types.MethodType(_as_rgba_disabled, mapper)
+        self._mapper = mapper
+
     @wraps(pv.BasePlotter.set_background)
     def set_background(self, color, top=None, right=None, side=None, corner=None, all_renderers=True):
         # the background color is not set unless the top color is set as well to enforce it 
@@ -291,7 +306,6 @@ class ImguiPlotter(VTKImguiRenderWindowInteractor, pv.BasePlotter):
             self.imgui_backend.show(title=self.title, window_size=window_size)
 
         if self._run_background:
-            from threading import Thread
             self._thread = Thread(target=_show)
             self._thread.start()
         else:
@@ -371,11 +385,24 @@ class ImguiPlotter(VTKImguiRenderWindowInteractor, pv.BasePlotter):
         # Clean the points before glyphing
         if tolerance is not None:
             small = pv.PolyData(dataset.points)
-            small.point_data.update(dataset.point_data)
-            dataset = small.clean(point_merging=True, merge_tol=tolerance,
-                                  lines_to_points=False, polys_to_lines=False,
-                                  strips_to_polys=False, inplace=False,
-                                  absolute=absolute)
+            # share the point arrays (and the active attributes) without copying them in python
+            small.GetPointData().ShallowCopy(dataset.GetPointData())
+            cleaner = vtkCleanPolyData()
+            cleaner.SetInputData(small)
+            cleaner.PointMergingOn()
+            cleaner.ConvertLinesToPointsOff()
+            cleaner.ConvertPolysToLinesOff()
+            cleaner.ConvertStripsToPolysOff()
+            if absolute:
+                cleaner.ToleranceIsAbsoluteOn()
+                cleaner.SetAbsoluteTolerance(tolerance)
+            else:
+                cleaner.SetTolerance(tolerance)
+            cleaner.Update()
+            # same check as PolyData.clean, do not silently glyph an empty dataset
+            if cleaner.GetOutput().GetNumberOfPoints() == 0 and small.GetNumberOfPoints() > 0:
+                raise ValueError('Clean tolerance is too high. Empty mesh returned.')
+            dataset = pv.wrap(cleaner.GetOutput())
 
         # Make glyphing geometry if necessary
         if geom is None:
@@ -383,9 +410,13 @@ class ImguiPlotter(VTKImguiRenderWindowInteractor, pv.BasePlotter):
 
         # Check if a table of geometries was passed
         if isinstance(geom, (np.ndarray, Sequence)):
+            geom = list(geom)
+            for subgeom in geom:
+                if not isinstance(subgeom, vtkPolyData):
+                    raise TypeError('Only PolyData objects can be used as glyphs.')
             if indices is None:
                 # use default "categorical" indices
-                indices = np.arange(len(geom))
+                indices = range(len(geom))
             if not isinstance(indices, (np.ndarray, Sequence)):
                 raise TypeError('If "geom" is a sequence then "indices" must '
                                 'also be a sequence of the same length.')
@@ -393,9 +424,9 @@ class ImguiPlotter(VTKImguiRenderWindowInteractor, pv.BasePlotter):
                 raise ValueError('The sequence "indices" must be the same length '
                                  'as "geom".')
         else:
+            if not isinstance(geom, vtkPolyData):
+                raise TypeError('Only PolyData objects can be used as glyphs.')
             geom = [geom]
-        if any(not isinstance(subgeom, vtkPolyData) for subgeom in geom):
-            raise TypeError('Only PolyData objects can be used as glyphs.')
 
         # Prepare the mapper
         mapper = vtkGlyph3DMapper()
@@ -415,9 +446,16 @@ class ImguiPlotter(VTKImguiRenderWindowInteractor, pv.BasePlotter):
             scale = True
         if scale:
             if scale_array_name is not None:
-                scale_array = dataset.get_array(scale_array_name, preference='cell')
-
-                if scale_array.ndim > 1:
+                # only the number of components is required, so query the vtk array directly
+                scale_array = dataset.GetCellData().GetArray(scale_array_name)
+                if scale_array is None:
+                    scale_array = dataset.GetPointData().GetArray(scale_array_name)
+                if scale_array is not None:
+                    vector_scale = scale_array.GetNumberOfComponents() > 1
+                else:
+                    # let pyvista search the field data as well, it raises a KeyError for unknown names
+                    vector_scale = dataset.get_array(scale_array_name, preference='cell').ndim > 1
+                if vector_scale:
                     mapper.SetScaleModeToScaleByVectorComponents()
                 else:
                     mapper.SetScaleModeToScaleByMagnitude()
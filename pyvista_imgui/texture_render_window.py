@@ -1,5 +1,5 @@
 from vtkmodules.vtkRenderingOpenGL2 import vtkGenericOpenGLRenderWindow, vtkTextureObject
-from vtkmodules.vtkCommonCore import VTK_FLOAT
+from vtkmodules.vtkCommonCore import VTK_UNSIGNED_CHAR
 import typing as typ
 
 
@@ -10,18 +10,38 @@ class VTKOpenGLTextureRenderWindow(object):
     """
     Class to render the output of one or multiple vtk renderers into an opengl texture object. The texture can be retrieved for use in other visualization packages based on opengl.
     """
-    def __init__(self) -> None:
+    def __init__(self, use_depth: bool = True, channels: int = 4) -> None:
         """
         A specialization of a vtkRenderWindow that renders itself into an opengl texture 
         when calling the 'render' method. 
         The resulting texture an be retrieved for use in external visualization packages based on opengl.
 
         The size of the resulting texture can be resized dynamically upon calling 'render'
+
+        The render window uses the OpenGL context that is current when rendering (e.g. the one of
+        the imgui application), so 'render' has to be called from the thread owning that context.
+
+        Parameters
+        ----------
+        use_depth, optional
+            attach a depth buffer to the framebuffer rendered into, True by default.
+            Only scenes drawn without depth testing (e.g. purely 2D overlays) should disable it.
+        channels, optional
+            the number of 8 bit color channels of the texture, 4 (GL_RGBA8) by default.
+            3 (GL_RGB8) drops the alpha channel, which is sampled as opaque instead.
         """
   
         self._tex = None
         self._renderers = []
-
+        self._use_depth = use_depth
+        if channels not in (3, 4):
+            raise ValueError(f"Unsupported number of texture channels {channels}, expected 3 or 4")
+        self._channels = channels
+        # items of the renderer and prop collections along with the collection's mtime,
+        # the collections are kept alive to ensure vtk returns the same python objects for them
+        self._collections = {}
+
+        # size the texture has been allocated with
         self._texture_size = (0, 0)
 
         self.render_window = vtkGenericOpenGLRenderWindow()
@@ -45,6 +65,41 @@ class VTKOpenGLTextureRenderWindow(object):
     def size(self, size: tuple[int, int]) -> None:
         self.render_window.SetSize(int(size[0]), int(size[1]))
 
+    def scene_mtime(self) -> int:
+        """
+        Returns the most recent modification time of anything affecting the rendered image,
+        i.e. the render window itself, its renderers, their active cameras, props and lights.
+        """
+        mtime = self.render_window.GetMTime()
+        renderers = self.render_window.GetRenderers()
+        cached = self._collections.get(renderers)
+        if cached is None or cached[0] != renderers.GetMTime():
+            # drop the cached prop collections of renderers that might have been removed
+            self._collections.clear()
+        for renderer in self._collection_items(renderers):
+            props = renderer.GetViewProps()
+            # adding or removing props only modifies the collection
+            mtime = max(mtime, renderer.GetMTime(), renderer.GetActiveCamera().GetMTime(), props.GetMTime())
+            for prop in self._collection_items(props):
+                mtime = max(mtime, prop.GetRedrawMTime())
+            # the renderer's mtime does not include its lights
+            lights = renderer.GetLights()
+            mtime = max(mtime, lights.GetMTime())
+            for light in self._collection_items(lights):
+                mtime = max(mtime, light.GetMTime())
+        return mtime
+
+    def _collection_items(self, collection) -> tuple:
+        """
+        Returns the items of a vtk collection, the python list of items is only rebuilt
+        after the collection has been modified.
+        """
+        collection_mtime = collection.GetMTime()
+        cached = self._collections.get(collection)
+        if cached is None or cached[0] != collection_mtime:
+            cached = self._collections[collection] = (collection_mtime, tuple(collection))
+        return cached[1]
+
     def render(self) -> None:
         """ 
         Renders the vtk output into a texture of appropriate size.
@@ -56,11 +111,13 @@ class VTKOpenGLTextureRenderWindow(object):
         vtk_fbo.SaveCurrentBindingsAndBuffers()
         vtk_fbo.Bind()
         vtk_fbo.AddColorAttachment(0, self._tex)
-        vtk_fbo.AddDepthAttachment()
+        if self._use_depth:
+            vtk_fbo.AddDepthAttachment()
         vtk_fbo.ActivateBuffer(0)
 
+        # no need to wait for completion, imgui samples the texture within the same context,
+        # which orders the draw calls after vtk's rendering
         self.render_window.Render()
-        #self.render_window.WaitForCompletion()
 
         vtk_fbo.RestorePreviousBindingsAndBuffers()
 
@@ -70,11 +127,16 @@ class VTKOpenGLTextureRenderWindow(object):
         """
         if attr == '__vtk__':
             return lambda t=self.render_window: t
-        elif hasattr(self.render_window, attr):
-            return getattr(self.render_window, attr)
-        else:
+        try:
+            value = getattr(self.render_window, attr)
+        except AttributeError:
             raise AttributeError(self.__class__.__name__ +
-                  " has no attribute named " + attr)
+                  " has no attribute named " + attr) from None
+        # cache resolved methods, so subsequent lookups do not end up here again.
+        # Other values (e.g. vtk's snake_case properties) have to be read from the vtk object every time
+        if callable(value):
+            self.__dict__[attr] = value
+        return value
         
     def set_viewport_size(self, new_size: tuple[int, int]) -> None:
         """
@@ -86,6 +148,8 @@ class VTKOpenGLTextureRenderWindow(object):
         new_size
             the new size of the viewport
         """
+        # normalize once, so the size compares equal to the cached one regardless of its sequence type
+        new_size = (int(new_size[0]), int(new_size[1]))
 
         # init the internal render window to use the current (texture) context
         # create a texture object to render into
@@ -99,19 +163,21 @@ class VTKOpenGLTextureRenderWindow(object):
             self._tex = vtkTextureObject()
             self._tex.SetContext(self.render_window)
 
-            # allocate the texture object using the initial size
-            self._tex.Create2D(new_size[0], new_size[1], 4, VTK_FLOAT, False)
+            # allocate the texture object using the initial size,
+            # 8 bit channels match the precision of vtk's own display framebuffer
+            self._tex.Create2D(new_size[0], new_size[1], self._channels, VTK_UNSIGNED_CHAR, False)
             self._tex.SetWrapS(vtkTextureObject.ClampToEdge)
             self._tex.SetWrapT(vtkTextureObject.ClampToEdge)
             self._tex.SetMinificationFilter(vtkTextureObject.Linear)
             self._tex.SetLinearMagnification(True)
             self._tex.Bind()
             self._tex.SendParameters()
+            self._texture_size = new_size
 
-        current_size = self.size
-        # if nothing has changed just return
-        if current_size == new_size or any(s <= 0 for s in new_size):
+        # compare against the allocated texture, the render window might have been resized already
+        if new_size == self._texture_size or new_size[0] <= 0 or new_size[1] <= 0:
             return
         
         self.size = new_size
         self._tex.Resize(new_size[0], new_size[1])
+        self._texture_size = new_size